@@ -15,12 +15,10 @@
 
 #     # --- 1. Parse and Organize Initial Data ---
 #     table_box = None
-#     header_cells = []
 #     data_cells = []
 
-#     lines = raw_data.strip().split('\n')
-#     for line in lines:
-#         parts = line.strip().split()
+#     for line in raw_data.splitlines():
+#         parts = line.split()
 #         if not parts:
 #             continue
 #         class_id = int(parts[0])
@@ -28,9 +26,7 @@
 
 #         if class_id == 1: # Table boundary
 #             table_box = coords
-#         elif class_id == 2: # Header cells
-#             header_cells.append(coords)
-#         elif class_id == 0: # Data cells
+#         elif class_id == 0: # Data cells (header cells, class 2, are not needed)
 #             data_cells.append(coords)
 
 #     if not table_box or not data_cells or len(data_cells) < 2:
@@ -38,18 +34,15 @@
 
 #     # Group data cells into rows based on their y_center coordinate
 #     # We use a tolerance to group cells with similar y-coordinates into the same row
-#     y_centers = np.array([cell[1] for cell in data_cells])
-#     unique_y = []
-#     # Find unique y-centers within a small tolerance
-#     for y in sorted(np.unique(y_centers)):
-#         if not unique_y or abs(y - unique_y[-1]) > 0.01: # 0.01 is a tolerance factor
-#             unique_y.append(y)
-            
+#     # Sort once by y and sweep, starting a new row once a cell is a full tolerance below the row's top cell
 #     initial_rows = []
-#     for uy in unique_y:
-#         row = sorted([cell for cell in data_cells if abs(cell[1] - uy) < 0.01], key=lambda c: c[0])
-#         if row:
-#             initial_rows.append(row)
+#     row_top = None
+#     for cell in sorted(data_cells, key=lambda c: c[1]):
+#         if row_top is None or cell[1] - row_top >= 0.01: # 0.01 is a tolerance factor
+#             initial_rows.append([])
+#             row_top = cell[1]
+#         initial_rows[-1].append(cell)
+#     initial_rows = [sorted(row, key=lambda c: c[0]) for row in initial_rows]
 
 #     if len(initial_rows) < 2:
 #         raise ValueError("Could not detect at least two distinct rows from the provided data cells.")
@@ -72,19 +65,23 @@
 #     table_y_center, table_height = table_box[1], table_box[3]
 #     table_bottom_edge = table_y_center + (table_height / 2)
 
+#     # Track the first cell's y-center as a running total; its half height never changes
+#     current_y = last_known_row[0][1]
+#     half_height = last_known_row[0][3] / 2
+
 #     while True:
+#         # Check if the next row would fall outside the table boundary
+#         # We check the bottom of the new cells (y + h/2)
+#         current_y += row_pitch
+#         if current_y + half_height >= table_bottom_edge:
+#             break # Stop if we've gone past the table's end
+
 #         next_row = []
 #         for cell in current_row_template:
 #             x, y, w, h = cell
 #             # Create new cell by shifting the y-coordinate down by the pitch
 #             new_cell = (x, y + row_pitch, w, h)
 #             next_row.append(new_cell)
-        
-#         # Check if the newly generated row is outside the table boundary
-#         # We check the bottom of the new cells (y + h/2)
-#         new_row_bottom = next_row[0][1] + (next_row[0][3] / 2)
-#         if new_row_bottom >= table_bottom_edge:
-#             break # Stop if we've gone past the table's end
 
 #         generated_rows.append(next_row)
 #         current_row_template = next_row # The new row becomes the template for the next one
@@ -134,91 +131,103 @@
 
 
 
+import sys
+from typing import Union
+
 import numpy as np
-from collections import defaultdict
 
-def annotate_remaining_cells(raw_data: str):
+def _parse(raw_data):
+    """
+    Parses 'class_id x_center y_center width height' lines into an (N, 5) array.
+    Lines without exactly five fields are skipped.
+    
+    Returns the array together with its int32 class ids.
+    """
+    # Drop blank and malformed lines up front, then convert everything in one C-level
+    # scan instead of per-token int()/float() calls; bytes lines are read as-is
+    lines = [line for line in raw_data.splitlines() if len(line.split()) == 5]
+    if not lines:
+        raise ValueError("No valid annotations found")
+    
+    arr = np.loadtxt(lines, dtype=np.float64, comments=None, ndmin=2)
+    if not np.isfinite(arr).all():
+        raise ValueError("Annotations must not contain NaN or infinite values")
+    
+    cls = arr[:, 0].astype(np.int32)
+    return arr, cls
+
+
+def annotate_remaining_cells(raw_data: Union[str, bytes]):
     """
     Automates table cell annotation regardless of initial labeling order.
     
     Args:
-        raw_data (str): Raw annotation data where each line is 'class_id x_center y_center width height'
+        raw_data (str | bytes): Raw annotation data where each line is 'class_id x_center y_center width height'
     
     Returns:
-        list[list[tuple]]: Newly generated rows of cell annotations (x, y, w, h)
+        np.ndarray: Newly generated rows of cell annotations, shaped (rows, cells, 4)
+                    with each cell as (x, y, w, h)
     """
     # --- 1. Parse and Classify Annotations ---
-    annotations = defaultdict(list)
-    lines = [line.strip() for line in raw_data.strip().split('\n') if line.strip()]
-    
-    for line in lines:
-        parts = line.split()
-        if len(parts) != 5:
-            continue
-        class_id = int(parts[0])
-        coords = tuple(float(p) for p in parts[1:])
-        annotations[class_id].append(coords)
+    arr, cls = _parse(raw_data)
     
     # --- 2. Identify Components (Flexible Classification) ---
-    # Strategy: Largest bbox is table, top-most row is likely header, others are data
-    all_boxes = [box for boxes in annotations.values() for box in boxes]
+    # Strategy: Largest bbox is table, the top-most class is the header, others are data
+    keep = cls != -1  # Skip boxes using the placeholder class
     
-    if not all_boxes:
-        raise ValueError("No valid annotations found")
+    # Find table (largest area box) and drop it by position
+    table_box = None
+    if len(arr) > 1:
+        table_row = int(np.argmax(arr[:, 3] * arr[:, 4]))
+        table_box = arr[table_row, 1:]
+        keep[table_row] = False
     
-    # Find table (largest area box)
-    table_box = max(all_boxes, key=lambda b: b[2]*b[3]) if len(all_boxes) > 1 else None
+    cells = arr[keep, 1:]
+    class_ids, class_idx = np.unique(cls[keep], return_inverse=True)
     
-    # Separate header and data cells
-    header_cells = []
-    data_cells = []
+    # Per-class top edge over the sorted class ids, so the choice never depends on line order
+    top_y = np.full(len(class_ids), np.inf)
+    np.minimum.at(top_y, class_idx, cells[:, 1])
     
-    for class_id, boxes in annotations.items():
-        if class_id == -1:  # Skip if using placeholder class
-            continue
-        for box in boxes:
-            if box == table_box:
-                continue
-            if not header_cells or box[1] < header_cells[0][1]:
-                header_cells.append(box)
-            else:
-                data_cells.append(box)
+    # Only data cells drive generation, so header cells are just masked out
+    # With a single class every cell is data
+    is_header = np.zeros(len(cells), dtype=bool)
+    if len(class_ids) > 1:
+        is_header = class_idx == np.argmin(top_y)
+    data_cells = cells[~is_header]
     
     # --- 3. Handle Edge Cases ---
-    if not table_box:
+    if table_box is None:
         # Estimate table bounds from existing cells
-        all_cells = header_cells + data_cells
-        x_centers = [c[0] for c in all_cells]
-        y_centers = [c[1] for c in all_cells]
-        widths = [c[2] for c in all_cells]
-        heights = [c[3] for c in all_cells]
+        x_min, y_min, w_min, h_min = cells.min(axis=0)
+        x_max, y_max, w_max, h_max = cells.max(axis=0)
         
-        table_x = (min(x_centers) + max(x_centers)) / 2
-        table_y = (min(y_centers) + max(y_centers)) / 2
-        table_w = max(x_centers) + max(widths)/2 - (min(x_centers) - min(widths)/2)
-        table_h = max(y_centers) + max(heights)/2 - (min(y_centers) - min(heights)/2)
+        table_x = (x_min + x_max) / 2
+        table_y = (y_min + y_max) / 2
+        table_w = x_max + w_max/2 - (x_min - w_min/2)
+        table_h = y_max + h_max/2 - (y_min - h_min/2)
         table_box = (table_x, table_y, table_w, table_h)
     
     # --- 4. Group Cells into Rows ---
     def group_into_rows(cells, y_tolerance=0.01):
-        if not cells:
+        if len(cells) == 0:
             return []
         
-        # Sort by y-center then x-center
-        sorted_cells = sorted(cells, key=lambda c: (c[1], c[0]))
+        # Sort by y-center; a row is every cell within the tolerance of its top-most cell,
+        # so each row's end is found by binary search instead of walking cell by cell
+        cells = np.asarray(cells, dtype=np.float64)
+        cells = cells[np.argsort(cells[:, 1], kind='stable')]
+        ys = cells[:, 1]
         
         rows = []
-        current_row = [sorted_cells[0]]
-        
-        for cell in sorted_cells[1:]:
-            if abs(cell[1] - current_row[-1][1]) < y_tolerance:
-                current_row.append(cell)
-            else:
-                rows.append(sorted(current_row, key=lambda c: c[0]))
-                current_row = [cell]
-        
-        if current_row:
-            rows.append(sorted(current_row, key=lambda c: c[0]))
+        start = 0
+        while start < len(cells):
+            end = int(np.searchsorted(ys, ys[start] + y_tolerance, side='left'))
+            end = max(end, start + 1)  # always consume at least one cell
+            row = cells[start:end]
+            # Order the cells of each row by x-center
+            rows.append(row[np.argsort(row[:, 0], kind='stable')])
+            start = end
         
         return rows
     
@@ -228,38 +237,39 @@ def annotate_remaining_cells(raw_data: str):
         raise ValueError("Need at least two complete rows to detect pattern")
     
     # --- 5. Calculate Row Pattern ---
-    row_pitch = all_rows[1][0][1] - all_rows[0][0][1]  # y-difference between rows
+    # Average y-difference between consecutive rows, measured on each row's left-most cell
+    first_ys = np.array([row[0, 1] for row in all_rows])
+    row_pitch = np.diff(first_ys).mean()
     
     # --- 6. Generate New Rows ---
-    generated_rows = []
-    last_row = all_rows[-1]
+    if row_pitch <= 0:
+        raise ValueError("Could not detect a positive row pitch")
+    
+    last_row = np.asarray(all_rows[-1], dtype=np.float64)
     table_bottom = table_box[1] + table_box[3]/2
     
-    while True:
-        new_row = []
-        for cell in last_row:
-            new_cell = (cell[0], cell[1] + row_pitch, cell[2], cell[3])
-            new_row.append(new_cell)
-        
-        # Check if new row exceeds table bounds
-        if new_row[0][1] + new_row[0][3]/2 >= table_bottom:
-            break
-            
-        generated_rows.append(new_row)
-        last_row = new_row
+    # Every new row is the last row shifted down by a whole number of pitches, so an upper
+    # bound on the rows that fit above the table bottom is known before generating any
+    free_space = table_bottom - last_row[0, 1] - last_row[0, 3]/2
+    max_rows = max(int(np.ceil(free_space / row_pitch)), 0)
+    offsets = np.arange(1, max_rows + 1) * row_pitch
+    
+    generated_rows = np.broadcast_to(last_row, (max_rows,) + last_row.shape).copy()
+    generated_rows[..., 1] += offsets[:, None]
+    
+    # Keep the rows whose first cell still ends above the table bottom
+    generated_rows = generated_rows[:np.searchsorted(offsets, free_space, side='left')]
     
     return generated_rows
 
 # --- Usage Example ---
-with open('C:\\Users\\s66\\Desktop\\check annto\\BOB_statement_with_password_page_3.txt', 'r') as f:
-    raw_data = f.read()
+with open('C:\\Users\\s66\\Desktop\\check annto\\BOB_statement_with_password_page_3.txt', 'rb') as f:
+    raw_data = f.read()  # label files are ASCII, so the bytes go straight to the parser
 
 try:
     new_rows = annotate_remaining_cells(raw_data)
-    print("Generated annotations:")
-    for i, row in enumerate(new_rows):
-        print(f"\n# Row {i+1}")
-        for cell in row:
-            print(f"0 {cell[0]:.6f} {cell[1]:.6f} {cell[2]:.6f} {cell[3]:.6f}")
+    print(f"Generated annotations ({len(new_rows)} rows):")
+    # Write every cell in one formatter pass, as class 0 lines ready to paste into the label file
+    np.savetxt(sys.stdout, new_rows.reshape(-1, 4), fmt='0 %.6f %.6f %.6f %.6f')
 except Exception as e:
     print(f"Error: {str(e)}")
\ No newline at end of file